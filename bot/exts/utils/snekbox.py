@@ -1,6 +1,5 @@
 import asyncio
 import contextlib
-import datetime
 import re
 from functools import partial
 from signal import Signals
@@ -8,7 +7,7 @@ from textwrap import dedent
 from typing import Optional, Tuple
 
 from botcore.utils import scheduling
-from botcore.utils.regex import FORMATTED_CODE_REGEX, RAW_CODE_REGEX
+from botcore.utils.regex import RAW_CODE_REGEX
 from discord import AllowedMentions, HTTPException, Message, NotFound, Reaction, User
 from discord.ext.commands import Cog, Command, Context, Converter, command, guild_only
 
@@ -18,10 +17,29 @@ from bot.decorators import redirect_output
 from bot.log import get_logger
 from bot.utils import send_to_paste_service
 from bot.utils.messages import wait_for_deletion
+from bot.utils.stats import StatsPipeline
 
 log = get_logger(__name__)
 
 ESCAPE_REGEX = re.compile("[`\u202E\u200B]{3,}")
+MENTION_ESCAPE_REGEX = re.compile("<!?@")
+
+# Code blocks are matched with one pattern per delimiter, so that none of them needs a backreference
+# to find the closing delimiter. This keeps the patterns free of backtracking-only features.
+FENCED_CODE_REGEX = re.compile(
+    r"```"                                  # fenced code block delimiter
+    r"(?:(?P<lang>[a-z]+)\n)?"              # optional language (only letters plus newline)
+    r"(?:[ \t]*\n)*"                        # any blank (empty or tabs/spaces only) lines before the code
+    r"(?P<code>.*?)"                        # extract all code inside the markup
+    r"\s*"                                  # any more whitespace before the end of the code markup
+    r"```",                                 # closing delimiter
+    re.DOTALL | re.IGNORECASE               # "." also matches newlines, case insensitive
+)
+# Inline code patterns by delimiter, longest delimiter first so it takes precedence when both match
+INLINE_CODE_REGEXES = {
+    delim: re.compile(rf"{delim}(?:[ \t]*\n)*(?P<code>.*?)\s*{delim}", re.DOTALL)
+    for delim in ("``", "`")
+}
 
 # The timeit command should only output the very last line, so all other output should be suppressed.
 # This will be used as the setup code along with any setup code provided.
@@ -64,6 +82,8 @@ if not hasattr(sys, "_setup_finished"):
     sys._setup_finished = None
 {setup}
 """
+# The wrapper is split around the setup code once, so it doesn't need to be parsed by format() for every job.
+TIMEIT_SETUP_PREFIX, TIMEIT_SETUP_SUFFIX = TIMEIT_SETUP_WRAPPER.split("{setup}")
 
 MAX_PASTE_LEN = 10000
 
@@ -73,6 +93,7 @@ NO_SNEKBOX_CATEGORIES = ()
 SNEKBOX_ROLES = (Roles.helpers, Roles.moderators, Roles.admins, Roles.owners, Roles.python_community, Roles.partners)
 
 SIGKILL = 9
+SIGNAL_NAMES = {signal.value: signal.name for signal in Signals}
 
 REDO_EMOJI = '\U0001f501'  # :repeat:
 REDO_TIMEOUT = 30
@@ -92,20 +113,25 @@ class CodeblockConverter(Converter):
 
         Return a list of code blocks if any, otherwise return a list with a single string of code.
         """
-        if match := list(FORMATTED_CODE_REGEX.finditer(code)):
-            blocks = [block for block in match if block.group("block")]
+        # Unformatted code is the most common input, and it doesn't need to be scanned for code blocks
+        has_markup = "`" in code
+        blocks = FENCED_CODE_REGEX.finditer(code) if has_markup else iter(())
 
-            if len(blocks) > 1:
-                codeblocks = [block.group("code") for block in blocks]
+        if block := next(blocks, None):
+            codeblocks = [block.group("code"), *(match.group("code") for match in blocks)]
+            if len(codeblocks) > 1:
                 info = "several code blocks"
             else:
-                match = match[0] if len(blocks) == 0 else blocks[0]
-                code, block, lang, delim = match.group("code", "block", "lang", "delim")
-                codeblocks = [dedent(code)]
-                if block:
-                    info = (f"'{lang}' highlighted" if lang else "plain") + " code block"
-                else:
-                    info = f"{delim}-enclosed inline code"
+                lang = block.group("lang")
+                codeblocks = [dedent(codeblocks[0])]
+                info = (f"'{lang}' highlighted" if lang else "plain") + " code block"
+        elif has_markup and (inline := [
+            (delim, match) for delim, regex in INLINE_CODE_REGEXES.items() if (match := regex.search(code))
+        ]):
+            # Use the first inline code in the message; min() keeps the registry order on a tie.
+            delim, match = min(inline, key=lambda item: item[1].start())
+            codeblocks = [dedent(match.group("code"))]
+            info = f"{delim}-enclosed inline code"
         else:
             codeblocks = [dedent(RAW_CODE_REGEX.fullmatch(code).group("code"))]
             info = "unformatted or badly formatted code"
@@ -120,7 +146,7 @@ class Snekbox(Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.jobs = {}
+        self.jobs: set[int] = set()
 
     async def post_job(self, code: str, *, args: Optional[list[str]] = None) -> dict:
         """Send a POST request to the Snekbox API to evaluate code and return the results."""
@@ -156,7 +182,7 @@ class Snekbox(Cog):
 
         code = "\n".join(codeblocks)
 
-        args.extend(["-s", TIMEIT_SETUP_WRAPPER.format(setup=setup)])
+        args.extend(["-s", TIMEIT_SETUP_PREFIX + setup + TIMEIT_SETUP_SUFFIX])
 
         return code, args
 
@@ -176,12 +202,9 @@ class Snekbox(Cog):
             msg = f"Your {job_name} job has failed"
             error = "A fatal NsJail error occurred"
         else:
-            # Try to append signal's name if one exists
-            try:
-                name = Signals(returncode - 128).name
+            # Append signal's name if one exists
+            if name := SIGNAL_NAMES.get(returncode - 128):
                 msg = f"{msg} ({name})"
-            except ValueError:
-                pass
 
         return msg, error
 
@@ -206,25 +229,22 @@ class Snekbox(Cog):
         original_output = output  # To be uploaded to a pasting service if needed
         paste_link = None
 
-        if "<@" in output:
-            output = output.replace("<@", "<@\u200B")  # Zero-width space
-
-        if "<!@" in output:
-            output = output.replace("<!@", "<!@\u200B")  # Zero-width space
+        if "<@" in output or "<!@" in output:
+            output = MENTION_ESCAPE_REGEX.sub("\\g<0>\u200B", output)  # Zero-width space
 
-        if ESCAPE_REGEX.findall(output):
+        # Every escape sequence contains either three backticks or one of the invisible characters
+        if ("```" in output or "\u202E" in output or "\u200B" in output) and ESCAPE_REGEX.search(output):
             paste_link = await self.upload_output(original_output)
             return "Code block escape attempt detected; will not output result", paste_link
 
         truncated = False
-        lines = output.count("\n")
+        # Only split off up to 12 parts: 11 lines to display, and the rest which only tells there are too many lines
+        lines = output.split("\n", 11)
 
-        if lines > 0:
-            output = [f"{i:03d} | {line}" for i, line in enumerate(output.split('\n'), 1)]
-            output = output[:11]  # Limiting to only 11 lines
-            output = "\n".join(output)
+        if len(lines) > 1:
+            output = "\n".join(f"{i:03d} | {line}" for i, line in enumerate(lines[:11], 1))
 
-        if lines > 10:
+        if len(lines) > 11:
             truncated = True
             if len(output) >= 1000:
                 output = f"{output[:1000]}\n... (truncated - too long, too many lines)"
@@ -254,39 +274,46 @@ class Snekbox(Cog):
 
         Return the bot response.
         """
-        async with ctx.typing():
-            results = await self.post_job(code, args=args)
-            msg, error = self.get_results_message(results, job_name)
-
-            if error:
-                output, paste_link = error, None
-            else:
-                log.trace("Formatting output...")
-                output, paste_link = await self.format_output(results["stdout"])
-
-            icon = self.get_status_emoji(results)
-            msg = f"{ctx.author.mention} {icon} {msg}.\n\n```\n{output}\n```"
-            if paste_link:
-                msg = f"{msg}\nFull output: {paste_link}"
+        # Start the job right away so the request to snekbox isn't held up by the typing request to Discord
+        job = asyncio.create_task(self.post_job(code, args=args))
+        try:
+            async with ctx.typing():
+                results = await job
+                msg, error = self.get_results_message(results, job_name)
+
+                if error:
+                    output, paste_link = error, None
+                else:
+                    log.trace("Formatting output...")
+                    output, paste_link = await self.format_output(results["stdout"])
 
-            # Collect stats of job fails + successes
-            if icon == ":x:":
-                self.bot.stats.incr("snekbox.python.fail")
-            else:
-                self.bot.stats.incr("snekbox.python.success")
-
-            filter_cog = self.bot.get_cog("Filtering")
-            filter_triggered = False
-            if filter_cog:
-                filter_triggered = await filter_cog.filter_snekbox_output(msg, ctx.message)
-            if filter_triggered:
-                response = await ctx.send("Attempt to circumvent filter detected. Moderator team has been alerted.")
-            else:
-                allowed_mentions = AllowedMentions(everyone=False, roles=False, users=[ctx.author])
-                response = await ctx.send(msg, allowed_mentions=allowed_mentions)
-            scheduling.create_task(wait_for_deletion(response, (ctx.author.id,)), event_loop=self.bot.loop)
+                icon = self.get_status_emoji(results)
+                msg = f"{ctx.author.mention} {icon} {msg}.\n\n```\n{output}\n```"
+                if paste_link:
+                    msg = f"{msg}\nFull output: {paste_link}"
 
-            log.info(f"{ctx.author}'s {job_name} job had a return code of {results['returncode']}")
+                # Collect stats of job fails + successes
+                if icon == ":x:":
+                    self.bot.stats.incr("snekbox.python.fail")
+                else:
+                    self.bot.stats.incr("snekbox.python.success")
+
+                filter_cog = self.bot.get_cog("Filtering")
+                filter_triggered = False
+                if filter_cog:
+                    filter_triggered = await filter_cog.filter_snekbox_output(msg, ctx.message)
+                if filter_triggered:
+                    response = await ctx.send("Attempt to circumvent filter detected. Moderator team has been alerted.")
+                else:
+                    allowed_mentions = AllowedMentions(everyone=False, roles=False, users=[ctx.author])
+                    response = await ctx.send(msg, allowed_mentions=allowed_mentions)
+                scheduling.create_task(wait_for_deletion(response, (ctx.author.id,)), event_loop=self.bot.loop)
+
+                log.info(f"{ctx.author}'s {job_name} job had a return code of {results['returncode']}")
+        except BaseException:
+            # Don't leave the job running unawaited if the typing request fails or this is cancelled
+            job.cancel()
+            raise
         return response
 
     async def continue_job(
@@ -308,23 +335,27 @@ class Snekbox(Cog):
                     check=_predicate_message_edit,
                     timeout=REDO_TIMEOUT
                 )
-                await ctx.message.add_reaction(REDO_EMOJI)
+            except asyncio.TimeoutError:
+                # The reaction is only added once the message is edited, so there is nothing to clear
+                return None, None
+
+            await ctx.message.add_reaction(REDO_EMOJI)
+            try:
                 await self.bot.wait_for(
                     'reaction_add',
                     check=_predicate_emoji_reaction,
                     timeout=10
                 )
-
-                code = await self.get_code(new_message, ctx.command)
+            except asyncio.TimeoutError:
                 await ctx.message.clear_reaction(REDO_EMOJI)
-                with contextlib.suppress(HTTPException):
-                    await response.delete()
+                return None, None
 
-                if code is None:
-                    return None, None
+            code = await self.get_code(new_message, ctx.command)
+            await ctx.message.clear_reaction(REDO_EMOJI)
+            with contextlib.suppress(HTTPException):
+                await response.delete()
 
-            except asyncio.TimeoutError:
-                await ctx.message.clear_reaction(REDO_EMOJI)
+            if code is None:
                 return None, None
 
             codeblocks = await CodeblockConverter.convert(ctx, code)
@@ -372,26 +403,27 @@ class Snekbox(Cog):
             )
             return
 
-        if Roles.helpers in (role.id for role in ctx.author.roles):
-            self.bot.stats.incr("snekbox_usages.roles.helpers")
-        else:
-            self.bot.stats.incr("snekbox_usages.roles.developers")
+        with StatsPipeline(self.bot.stats) as stats:
+            if Roles.helpers in (role.id for role in ctx.author.roles):
+                stats.incr("snekbox_usages.roles.helpers")
+            else:
+                stats.incr("snekbox_usages.roles.developers")
 
-        if ctx.channel.category_id == Categories.help_in_use:
-            self.bot.stats.incr("snekbox_usages.channels.help")
-        elif ctx.channel.id == Channels.bot_commands:
-            self.bot.stats.incr("snekbox_usages.channels.bot_commands")
-        else:
-            self.bot.stats.incr("snekbox_usages.channels.topical")
+            if ctx.channel.category_id == Categories.help_in_use:
+                stats.incr("snekbox_usages.channels.help")
+            elif ctx.channel.id == Channels.bot_commands:
+                stats.incr("snekbox_usages.channels.bot_commands")
+            else:
+                stats.incr("snekbox_usages.channels.topical")
 
         log.info(f"Received code from {ctx.author} for evaluation:\n{code}")
 
         while True:
-            self.jobs[ctx.author.id] = datetime.datetime.now()
+            self.jobs.add(ctx.author.id)
             try:
                 response = await self.send_job(ctx, code, args=args, job_name=job_name)
             finally:
-                del self.jobs[ctx.author.id]
+                self.jobs.discard(ctx.author.id)
 
             code, args = await self.continue_job(ctx, response, ctx.command)
             if not code:
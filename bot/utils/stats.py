@@ -0,0 +1,18 @@
+from statsd.client.base import PipelineBase
+
+
+class StatsPipeline(PipelineBase):
+    """
+    Collect stats and send them to the statsd client in a single packet.
+
+    Use it as a context manager around a few related stats, which are sent together when the block exits:
+
+        with StatsPipeline(bot.stats) as stats:
+            stats.incr("some.stat")
+            stats.incr("some.other.stat")
+    """
+
+    def _send(self) -> None:
+        """Send all of the collected stats at once, separated by newlines."""
+        self._client._after("\n".join(self._stats))
+        self._stats.clear()
@@ -1,6 +1,6 @@
 import asyncio
 import unittest
-from unittest.mock import AsyncMock, MagicMock, Mock, call, create_autospec, patch
+from unittest.mock import AsyncMock, MagicMock, call, create_autospec, patch
 
 from discord import AllowedMentions
 from discord.ext import commands
@@ -8,7 +8,9 @@ from discord.ext import commands
 from bot import constants
 from bot.exts.utils import snekbox
 from bot.exts.utils.snekbox import Snekbox
-from tests.helpers import MockBot, MockContext, MockMessage, MockReaction, MockUser
+from tests.helpers import (
+    MockBot, MockContext, MockMember, MockMessage, MockReaction, MockRole, MockTextChannel, MockUser
+)
 
 
 class SnekboxTests(unittest.IsolatedAsyncioTestCase):
@@ -50,6 +52,7 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
         cases = (
             ('print("Hello world!")', 'print("Hello world!")', 'non-formatted'),
             ('`print("Hello world!")`', 'print("Hello world!")', 'one line code block'),
+            ('``print("Hello world!")``', 'print("Hello world!")', 'double backtick inline code'),
             ('```\nprint("Hello world!")```', 'print("Hello world!")', 'multiline code block'),
             ('```py\nprint("Hello world!")```', 'print("Hello world!")', 'multiline python code block'),
             ('text```print("Hello world!")```text', 'print("Hello world!")', 'code block surrounded by text'),
@@ -58,7 +61,10 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
             ('`print("Hello world!")`\ntext\n```print("How\'s it going?")```',
              'print("How\'s it going?")', 'code block preceded by inline code'),
             ('`print("Hello world!")`\ntext\n`print("Hello world!")`',
-             'print("Hello world!")', 'one inline code block of two')
+             'print("Hello world!")', 'one inline code block of two'),
+            ('`print("Hello world!")`\ntext\n``print("How\'s it going?")``',
+             'print("Hello world!")', 'first of two inline code blocks with different delimiters'),
+            ('here: `a```b```', 'b', 'fenced code block preferred over inline code touching it')
         )
         for case, expected, testname in cases:
             with self.subTest(msg=f'Extract code from {testname}.'):
@@ -93,16 +99,15 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
                 actual = self.cog.get_results_message({'stdout': stdout, 'returncode': returncode}, 'eval')
                 self.assertEqual(actual, expected)
 
-    @patch('bot.exts.utils.snekbox.Signals', side_effect=ValueError)
-    def test_get_results_message_invalid_signal(self, mock_signals: Mock):
+    @patch('bot.exts.utils.snekbox.SIGNAL_NAMES', {})
+    def test_get_results_message_invalid_signal(self):
         self.assertEqual(
             self.cog.get_results_message({'stdout': '', 'returncode': 127}, 'eval'),
             ('Your eval job has completed with return code 127', '')
         )
 
-    @patch('bot.exts.utils.snekbox.Signals')
-    def test_get_results_message_valid_signal(self, mock_signals: Mock):
-        mock_signals.return_value.name = 'SIGTEST'
+    @patch('bot.exts.utils.snekbox.SIGNAL_NAMES', {-1: 'SIGTEST'})
+    def test_get_results_message_valid_signal(self):
         self.assertEqual(
             self.cog.get_results_message({'stdout': '', 'returncode': 127}, 'eval'),
             ('Your eval job has completed with return code 127 (SIGTEST)', '')
@@ -198,6 +203,21 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
         )
         self.cog.continue_job.assert_called_with(ctx, response, ctx.command)
 
+    async def test_run_job_sends_usage_stats_together(self):
+        """The role and channel usage stats should be sent to statsd in a single packet."""
+        ctx = MockContext(
+            author=MockMember(roles=[MockRole(id=constants.Roles.helpers)]),
+            channel=MockTextChannel(id=constants.Channels.bot_commands),
+        )
+        self.cog.send_job = AsyncMock(return_value=MockMessage())
+        self.cog.continue_job = AsyncMock(return_value=(None, None))
+
+        await self.cog.run_job('eval', ctx, 'MyAwesomeCode')
+
+        self.bot.stats._after.assert_called_once_with(
+            "snekbox_usages.roles.helpers:1|c\nsnekbox_usages.channels.bot_commands:1|c"
+        )
+
     async def test_eval_command_reject_two_eval_at_the_same_time(self):
         """Test if the eval command rejects an eval if the author already have a running eval."""
         ctx = MockContext()
@@ -300,6 +320,55 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
         self.cog.get_results_message.assert_called_once_with({'stdout': 'ERROR', 'returncode': 127}, 'eval')
         self.cog.format_output.assert_not_called()
 
+    async def test_send_job_posts_job_before_typing(self):
+        """The job should be posted without waiting for the typing request to finish."""
+        ctx = MockContext()
+        ctx.message = MockMessage()
+        ctx.send = AsyncMock()
+        job_started = asyncio.Event()
+
+        async def post_job(*args, **kwargs):
+            job_started.set()
+            return {'stdout': '', 'returncode': 0}
+
+        async def enter_typing(*args):
+            await asyncio.wait_for(job_started.wait(), timeout=1)
+
+        self.cog.post_job = post_job
+        self.cog.format_output = AsyncMock(return_value=('[No output]', None))
+        self.bot.get_cog.return_value = None
+        ctx.typing.return_value.__aenter__.side_effect = enter_typing
+
+        await self.cog.send_job(ctx, 'MyAwesomeCode', job_name='eval')
+        ctx.send.assert_called_once()
+
+    async def test_send_job_cancels_job_if_typing_fails(self):
+        """The job should be cancelled and the error propagated if the typing request fails."""
+        ctx = MockContext()
+        ctx.send = AsyncMock()
+        job_started = asyncio.Event()
+        jobs = []
+
+        async def post_job(*args, **kwargs):
+            jobs.append(asyncio.current_task())
+            job_started.set()
+            await asyncio.Event().wait()  # Never finishes on its own
+
+        async def enter_typing(*args):
+            await asyncio.wait_for(job_started.wait(), timeout=1)
+            raise RuntimeError("typing failed")
+
+        self.cog.post_job = post_job
+        ctx.typing.return_value.__aenter__.side_effect = enter_typing
+
+        with self.assertRaisesRegex(RuntimeError, "typing failed"):
+            await self.cog.send_job(ctx, 'MyAwesomeCode', job_name='eval')
+
+        [job] = jobs
+        await asyncio.wait([job], timeout=1)
+        self.assertTrue(job.cancelled())
+        ctx.send.assert_not_called()
+
     @patch("bot.exts.utils.snekbox.partial")
     async def test_continue_job_does_continue(self, partial_mock):
         """Test that the continue_job function does continue if required conditions are met."""
@@ -333,6 +402,17 @@ class SnekboxTests(unittest.IsolatedAsyncioTestCase):
 
         actual = await self.cog.continue_job(ctx, MockMessage(), self.cog.eval_command)
         self.assertEqual(actual, (None, None))
+        ctx.message.add_reaction.assert_not_called()
+        ctx.message.clear_reaction.assert_not_called()
+
+    async def test_continue_job_does_not_continue_without_reaction(self):
+        """The redo reaction should be cleared if the message was edited but the reaction wasn't clicked."""
+        ctx = MockContext(message=MockMessage(clear_reactions=AsyncMock()))
+        self.bot.wait_for.side_effect = ((None, MockMessage()), asyncio.TimeoutError)
+
+        actual = await self.cog.continue_job(ctx, MockMessage(), self.cog.eval_command)
+        self.assertEqual(actual, (None, None))
+        ctx.message.add_reaction.assert_called_once_with(snekbox.REDO_EMOJI)
         ctx.message.clear_reaction.assert_called_once_with(snekbox.REDO_EMOJI)
 
     async def test_get_code(self):
@@ -0,0 +1,27 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bot.utils.stats import StatsPipeline
+
+
+class StatsPipelineTests(unittest.TestCase):
+    """Tests for the `StatsPipeline` class."""
+
+    def setUp(self):
+        self.client = MagicMock(_prefix="bot")
+
+    def test_sends_stats_in_single_packet(self):
+        """All stats collected in the pipeline should be sent in a single call on exit."""
+        with StatsPipeline(self.client) as stats:
+            stats.incr("first")
+            stats.incr("second", 2)
+            self.client._after.assert_not_called()
+
+        self.client._after.assert_called_once_with("bot.first:1|c\nbot.second:2|c")
+
+    def test_sends_nothing_without_stats(self):
+        """Nothing should be sent if no stats were collected."""
+        with StatsPipeline(self.client):
+            pass
+
+        self.client._after.assert_not_called()
@@ -325,7 +325,9 @@ class MockBot(CustomMockMixin, unittest.mock.MagicMock):
         self.loop = _get_mock_loop()
         self.api_client = MockAPIClient(loop=self.loop)
         self.http_session = unittest.mock.create_autospec(spec=ClientSession, spec_set=True)
-        self.stats = unittest.mock.create_autospec(spec=AsyncStatsClient, spec_set=True)
+        # Spec an instance, so that instance attributes such as `_prefix` used by stats pipelines exist
+        self.stats = unittest.mock.create_autospec(spec=AsyncStatsClient(loop=self.loop), spec_set=True)
+        self.stats._prefix = None
         self.add_cog = unittest.mock.AsyncMock()
 
 